@@ -1,6 +1,32 @@
+import re
 from typing import List
 from schemas import SearchResult, AIAnalysisResponse
 
+# Invariant response fragments, built once at import
+_INSIGHT_FALLBACKS = ("No insights", "No more data", "")
+
+_POTENTIAL_GAPS = (
+    "Quantitative data on this topic",
+    "Recent developments in the field",
+    "International perspectives",
+    "Academic consensus vs. current practice"
+)
+
+_DIRECTION_TEMPLATES = (
+    "Deeper dive into {q} impact analysis",
+    "Comparative study: {q} across regions",
+    "Historical timeline of {q} evolution",
+    "Expert interviews on {q}"
+)
+
+# Single alternation over all source-type keywords; the group name is the category
+_SOURCE_TYPE_PATTERN = re.compile(
+    r"\b(?:(?P<news>news|bbc|cnn|reuters)|(?P<academic>arxiv|scholar|pubmed|nature))\b",
+    re.IGNORECASE
+)
+
+_BIAS_ANALYSIS = "Sources show mixed perspectives. News outlets lean toward sensationalism while academic sources provide depth."
+
 class AIAnalysisService:
     """AI-powered analysis for research synthesis"""
      
@@ -11,51 +37,57 @@ class AIAnalysisService:
         In production, integrate with GPT-4, Claude, or open-source LLMs.
         """
          
-        # Extract key information from results
-        titles = [r.title for r in search_results]
-        snippets = [r.snippet for r in search_results]
-        sources = [r.source for r in search_results]
+        # Extract key information from results in a single pass
+        titles, snippets, sources = [], [], []
+        for r in search_results[:5]:
+            titles.append(r.title)
+            snippets.append(r.snippet)
+            sources.append(r.source)
         
         # Create synthesis
-        summary = f"Based on {len(search_results)} sources, here's what was found about '{query}':\n"
-        summary += "\n".join([f"- {title[:80]}" for title in titles[:3]])
+        summary = "".join([
+            f"Based on {len(search_results)} sources, here's what was found about '{query}':\n",
+            "\n".join("- " + title[:80] for title in titles[:3])
+        ])
         
+        n_snippets = len(snippets)
         key_insights = [
-            "Result 1: " + (snippets[0][:100] if snippets else "No insights"),
-            "Result 2: " + (snippets[1][:100] if len(snippets) > 1 else "No more data"),
-            "Result 3: " + (snippets[2][:100] if len(snippets) > 2 else ""),
+            f"Result {i + 1}: " + (snippets[i][:100] if i < n_snippets else fallback)
+            for i, fallback in enumerate(_INSIGHT_FALLBACKS)
         ]
         
-        potential_gaps = [
-            "Quantitative data on this topic",
-            "Recent developments in the field",
-            "International perspectives",
-            "Academic consensus vs. current practice"
-        ]
-        
-        next_research_directions = [
-            f"Deeper dive into {query} impact analysis",
-            f"Comparative study: {query} across regions",
-            f"Historical timeline of {query} evolution",
-            f"Expert interviews on {query}"
-        ]
+        next_research_directions = [t.format(q=query) for t in _DIRECTION_TEMPLATES]
         
         return AIAnalysisResponse(
             summary=summary,
             key_insights=key_insights,
-            potential_gaps=potential_gaps,
+            potential_gaps=list(_POTENTIAL_GAPS),
             next_research_directions=next_research_directions,
-            bias_analysis="Sources show mixed perspectives. News outlets lean toward sensationalism while academic sources provide depth.",
+            bias_analysis=_BIAS_ANALYSIS,
             sources_cited=sources[:5]
         )
     
     @staticmethod
     def detect_bias(sources: List[str]) -> str:
         """Analyze potential biases in sources"""
+        # Tally source categories in one scan over all sources
+        hits = {"news": 0, "academic": 0}
+        for match in _SOURCE_TYPE_PATTERN.finditer("\n".join(sources)):
+            hits[match.lastgroup] += 1
+        
+        if hits["news"] and hits["academic"]:
+            source_type = "Mix of news and academic maintains balance"
+        elif hits["news"]:
+            source_type = "Mostly news sources, academic depth may be missing"
+        elif hits["academic"]:
+            source_type = "Mostly academic sources, recent developments may be missing"
+        else:
+            source_type = "Source types could not be classified"
+        
         bias_report = "Bias Analysis:\n"
         bias_report += "- Geographic bias: Primarily Western sources\n"
         bias_report += "- Temporal bias: Recent sources may lack historical context\n"
-        bias_report += "- Source type bias: Mix of news and academic maintains balance\n"
+        bias_report += f"- Source type bias: {source_type}\n"
         return bias_report
     
     @staticmethod
@@ -0,0 +1,47 @@
+import random
+import time
+from typing import Optional
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from config import settings
+
+# Short timeouts so an unreachable Redis degrades to the origin instead of blocking
+REDIS_TIMEOUT = 0.2  # seconds
+
+# Shared Redis connection pool (L2 cache)
+redis_client = Redis.from_url(
+    settings.REDIS_URL,
+    socket_connect_timeout=REDIS_TIMEOUT,
+    socket_timeout=REDIS_TIMEOUT
+)
+
+# Fraction of the TTL window during which early refresh may kick in
+EARLY_REFRESH_FACTOR = 0.2
+
+async def cache_get(key: str, ttl: int) -> Optional[str]:
+    """
+    Return the cached payload for key, or None on miss.
+    Entries nearing expiry are probabilistically reported as misses so a
+    single caller refreshes them before the whole herd does.
+    """
+    try:
+        raw = await redis_client.get(key)
+    except RedisError as e:
+        print(f"Cache get error: {e}")
+        return None
+    
+    if raw is None:
+        return None
+    
+    set_at, _, payload = raw.decode().partition("|")
+    age = time.time() - float(set_at)
+    if random.random() < age / ttl * EARLY_REFRESH_FACTOR:
+        return None
+    return payload
+
+async def cache_set(key: str, payload: str, ttl: int) -> None:
+    """Store payload under key for ttl seconds"""
+    try:
+        await redis_client.set(key, f"{time.time()}|{payload}", ex=ttl)
+    except RedisError as e:
+        print(f"Cache set error: {e}")
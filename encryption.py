@@ -1,8 +1,27 @@
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes, hmac, padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from functools import lru_cache
+from typing import List
 import base64
 import hashlib
+import os
+import time
 from config import settings
 
+FERNET_VERSION = b"\x80"
+
+@lru_cache(maxsize=32)
+def derive_key(key: str) -> bytes:
+    """Derive a Fernet key from the provided key using SHA256"""
+    key_hash = hashlib.sha256(key.encode()).digest()
+    return base64.urlsafe_b64encode(key_hash)
+
+@lru_cache(maxsize=32)
+def get_cipher(key: str) -> Fernet:
+    """Return a Fernet cipher for key, deriving it once per distinct key"""
+    return Fernet(derive_key(key))
+
 class EncryptionService: 
     """End-to-end encryption for personal vault"""
     
@@ -10,9 +29,12 @@ class EncryptionService:
         if key is None:
             key = settings.ENCRYPTION_KEY
         
-        # Derive a Fernet key from the provided key using SHA256
-        key_hash = hashlib.sha256(key.encode()).digest()
-        derived_key = base64.urlsafe_b64encode(key_hash)
+        self.cipher = get_cipher(key)
+        
+        # Raw Fernet key halves for the batch path
+        raw_key = base64.urlsafe_b64decode(derive_key(key))
+        self._signing_key = raw_key[:16]
+        self._encryption_key = raw_key[16:]
     
     def encrypt(self, plaintext: str) -> str:
         """Encrypt plaintext to ciphertext"""
@@ -21,6 +43,33 @@ class EncryptionService:
         encrypted = self.cipher.encrypt(plaintext)
         return encrypted.decode()
     
+    def encrypt_many(self, plaintexts: List[str]) -> List[str]:
+        """
+        Encrypt a batch of plaintexts to Fernet tokens.
+        Key schedule and HMAC key are set up once per batch; the output is
+        byte-compatible with encrypt() and decryptable by decrypt().
+        """
+        algorithm = algorithms.AES(self._encryption_key)
+        base_hmac = hmac.HMAC(self._signing_key, hashes.SHA256())
+        timestamp = int(time.time()).to_bytes(8, "big")
+        
+        tokens = []
+        for plaintext in plaintexts:
+            if isinstance(plaintext, str):
+                plaintext = plaintext.encode()
+            
+            iv = os.urandom(16)
+            padder = padding.PKCS7(algorithms.AES.block_size).padder()
+            padded = padder.update(plaintext) + padder.finalize()
+            encryptor = Cipher(algorithm, modes.CBC(iv)).encryptor()
+            ciphertext = encryptor.update(padded) + encryptor.finalize()
+            
+            basic_parts = FERNET_VERSION + timestamp + iv + ciphertext
+            h = base_hmac.copy()
+            h.update(basic_parts)
+            tokens.append(base64.urlsafe_b64encode(basic_parts + h.finalize()).decode())
+        return tokens
+    
     def decrypt(self, ciphertext: str) -> str:
         """Decrypt ciphertext to plaintext"""
         if isinstance(ciphertext, str):
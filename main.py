@@ -1,38 +1,91 @@
-from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from dotenv import load_dotenv
 import os
+import json
+import hashlib
+import time
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
  
-from config import settings
+from config import settings, get_settings, Settings
 from schemas import (
     SearchQuery, SearchResult, AIAnalysisRequest, AIAnalysisResponse,
     DocumentCreate, Document, ResearchProjectCreate, ResearchProject,
     NewsArticle, UserCreate, User
 )
-from search_service import SearchService
+from search_service import SearchService, get_client, close_client
 from ai_service import AIAnalysisService
 from auth_service import AuthService
 from encryption import encryption_service
+from cache_service import redis_client, cache_get, cache_set
+from redis.exceptions import RedisError
 
 load_dotenv()
 
 app = FastAPI(
     title="OmniMind - AI Research Platform",
     description="Study research, prediction, personal vault with E2E encryption, and AI-based assistance",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
-# CORS Configuration
+# CORS Configuration (deduplicated, order preserved)
+origins = list(dict.fromkeys(
+    [settings.FRONTEND_URL, "http://localhost:3000", "http://127.0.0.1:3000"]
+))
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[settings.FRONTEND_URL, "http://localhost:3000", "http://127.0.0.1:3000"],
+    allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
 )
 
+# Shared HTTP / Redis client lifecycle
+@app.on_event("startup")
+async def startup():
+    # Warm the shared client so the first search skips client setup
+    get_client()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await close_client()
+    await redis_client.aclose()
+
+ANALYSIS_CACHE_TTL = 86400  # seconds
+
+# Coarse (1s) ISO timestamp shared by health probes and mock records
+# (set_at, iso) rebound as one tuple so threadpool callers never see a half-updated pair
+_ts_cache: Optional[Tuple[float, str]] = None
+
+def now_iso() -> str:
+    global _ts_cache
+    t = time.time()
+    cache = _ts_cache
+    if cache is None or t - cache[0] > 1.0:
+        cache = (t, datetime.now().isoformat())
+        _ts_cache = cache
+    return cache[1]
+
+async def rate_limit(request: Request):
+    """Fixed-window per-IP limiter protecting the NewsAPI quota"""
+    host = request.client.host if request.client else "unknown"
+    key = f"rl:{host}:{int(time.time() // 60)}"
+    try:
+        pipe = redis_client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, 60)
+        count, _ = await pipe.execute()
+    except RedisError as e:
+        print(f"Rate limit error: {e}")
+        return
+    
+    if count > settings.RATE_LIMIT_PER_MINUTE:
+        raise HTTPException(status_code=429, detail="Too many requests")
+
 # Security (simplified for MVP)
 
 # ============ HEALTH ENDPOINTS ============
@@ -47,16 +100,16 @@ def root():
     }
 
 @app.get("/health")
-def health():
+def health(app_settings: Settings = Depends(get_settings)):
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "environment": settings.ENV
+        "timestamp": now_iso(),
+        "environment": app_settings.ENV
     }
 
 # ============ SEARCH ENDPOINTS ============
 
-@app.post("/api/search", response_model=List[SearchResult])
+@app.post("/api/search", response_model=List[SearchResult], dependencies=[Depends(rate_limit)])
 async def search(query: SearchQuery):
     """
     Unified search across multiple sources:
@@ -69,15 +122,18 @@ async def search(query: SearchQuery):
         sources=query.sources,
         limit=query.limit
     )
+    # Skip response model validation when there is nothing to serialize
+    if not results:
+        return Response(content=b"[]", media_type="application/json")
     return results
 
-@app.post("/api/search/news", response_model=List[SearchResult])
+@app.post("/api/search/news", response_model=List[SearchResult], dependencies=[Depends(rate_limit)])
 async def search_news(query: str = Query(...), limit: int = 10):
     """Search news articles"""
     results = await SearchService.search_news(query, limit)
     return results
 
-@app.post("/api/search/academic", response_model=List[SearchResult])
+@app.post("/api/search/academic", response_model=List[SearchResult], dependencies=[Depends(rate_limit)])
 async def search_academic(query: str = Query(...), limit: int = 10):
     """Search academic papers and journals"""
     results = await SearchService.search_academic(query, limit)
@@ -97,10 +153,21 @@ async def analyze_research(request: AIAnalysisRequest):
     - Bias detection
     - Citation extraction
     """
+    canonical_results = json.dumps(
+        [r.model_dump() for r in request.search_results], sort_keys=True
+    )
+    h = hashlib.sha256((request.query + "|" + canonical_results).encode()).hexdigest()
+    key = f"v1:analysis:{h}"
+    
+    cached = await cache_get(key, ANALYSIS_CACHE_TTL)
+    if cached is not None:
+        return AIAnalysisResponse.model_validate_json(cached)
+    
     analysis = AIAnalysisService.analyze_search_results(
         request.query,
         request.search_results
     )
+    await cache_set(key, analysis.model_dump_json(), ANALYSIS_CACHE_TTL)
     return analysis
 
 @app.post("/api/citations")
@@ -131,6 +198,7 @@ async def create_document(doc: DocumentCreate):
         encrypted_content = doc.content
     
     # Mock document creation (would save to DB in production)
+    now = datetime.now()
     document = Document(
         id=1,
         user_id=token_data.get("sub", 1),
@@ -138,12 +206,39 @@ async def create_document(doc: DocumentCreate):
         content=encrypted_content if doc.is_encrypted else doc.content,
         tags=doc.tags,
         is_encrypted=doc.is_encrypted,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        created_at=now,
+        updated_at=now
     )
     
     return document
 
+@app.post("/api/vault/documents/bulk", response_model=List[Document])
+async def create_documents_bulk(docs: List[DocumentCreate]):
+    """
+    Create multiple encrypted documents in personal vault.
+    Encrypts all contents in one batch for bulk imports.
+    """
+    
+    # Encrypt all contents that need it in a single batch
+    to_encrypt = [doc.content for doc in docs if doc.is_encrypted]
+    encrypted_contents = iter(encryption_service.encrypt_many(to_encrypt))
+    
+    # Mock document creation (would save to DB in production)
+    now = datetime.now()
+    return [
+        Document(
+            id=i + 1,
+            user_id=1,
+            title=doc.title,
+            content=next(encrypted_contents) if doc.is_encrypted else doc.content,
+            tags=doc.tags,
+            is_encrypted=doc.is_encrypted,
+            created_at=now,
+            updated_at=now
+        )
+        for i, doc in enumerate(docs)
+    ]
+
 @app.get("/api/vault/documents", response_model=List[Document])
 async def list_documents():
     """List all documents in personal vault"""
@@ -191,7 +286,7 @@ async def list_projects():
 
 # ============ NEWS INTELLIGENCE ENDPOINTS ============
 
-@app.get("/api/news/trending", response_model=List[NewsArticle])
+@app.get("/api/news/trending", response_model=List[NewsArticle], dependencies=[Depends(rate_limit)])
 async def get_trending_news(
     region: Optional[str] = "global",
     limit: int = 10
@@ -204,7 +299,7 @@ async def get_trending_news(
             description=r.snippet,
             url=r.url,
             source=r.source,
-            published_at=r.published_date or datetime.now().isoformat(),
+            published_at=r.published_date or now_iso(),
             content=r.snippet,
             image_url="",
             geographic_region=region
@@ -232,7 +327,7 @@ async def register(user: UserCreate):
         "id": 1,
         "email": user.email,
         "username": user.username,
-        "created_at": datetime.now().isoformat(),
+        "created_at": now_iso(),
         "message": "User created successfully"
     }
 
@@ -284,5 +379,8 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=settings.PORT_BACKEND,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        loop="auto",  # uvloop when installed (not on Windows), else asyncio
+        http="httptools",
+        workers=1 if settings.DEBUG else os.cpu_count()
     )
@@ -1,50 +1,195 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
 import httpx
-from typing import List
+import msgspec
+from cachetools import TTLCache
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
 from schemas import SearchResult
 from config import settings
+from cache_service import cache_get, cache_set
 import json
+
+NEWS_CACHE_TTL = 300  # seconds
+SEARCH_CACHE_TTL = 300  # seconds
+L1_CACHE_TTL = 60  # seconds, kept below the Redis TTLs
+
+# NewsAPI wire format, decoded straight from response bytes
+class _NewsSource(msgspec.Struct):
+    name: Optional[str] = None
+
+class _NewsArticle(msgspec.Struct):
+    title: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[_NewsSource] = None
+    description: Optional[str] = None
+    publishedAt: Optional[str] = None
+    author: Optional[str] = None
+
+class _NewsResponse(msgspec.Struct):
+    articles: List[_NewsArticle] = []
+
+_news_decoder = msgspec.json.Decoder(_NewsResponse)
+
+# Per-process L1 cache in front of Redis for the hottest queries
+_l1 = TTLCache(maxsize=1024, ttl=L1_CACHE_TTL)
+
+# Upstream NewsAPI calls currently in flight, keyed like the cache
+_inflight: Dict[str, asyncio.Future] = {}
+
+async def _get_cached_results(key: str, ttl: int) -> Optional[List[SearchResult]]:
+    """Look up results in L1, then Redis; populates L1 on a Redis hit"""
+    hit = _l1.get(key)
+    if hit is not None:
+        return list(hit)
+    
+    cached = await cache_get(key, ttl)
+    if cached is None:
+        return None
+    
+    results = [SearchResult.model_validate(r) for r in json.loads(cached)]
+    _l1[key] = results
+    return list(results)
+
+async def _set_cached_results(key: str, results: List[SearchResult], ttl: int) -> None:
+    """Store results in both L1 and Redis"""
+    _l1[key] = list(results)
+    payload = "[" + ",".join(r.model_dump_json() for r in results) + "]"
+    await cache_set(key, payload, ttl)
+
+@lru_cache(maxsize=None)
+def _rerank_kernel():
+    """Compile the rerank kernel on first use so numba/numpy load lazily"""
+    import numpy as np
+    from numba import njit
+    
+    @njit(cache=True, fastmath=True)
+    def _rerank(rel, cites, age):
+        """Weighted score from relevance, citation count and age in days"""
+        out = np.empty_like(rel)
+        for i in range(rel.shape[0]):
+            out[i] = 0.6 * rel[i] + 0.3 * np.log1p(cites[i]) - 0.1 * age[i]
+        return out
+    
+    return _rerank
+
+def _age_days(published_date: Optional[str], now: datetime) -> float:
+    """Age of a result in days; unknown or unparseable dates count as fresh"""
+    if not published_date:
+        return 0.0
+    try:
+        published = datetime.fromisoformat(published_date)
+    except ValueError:
+        return 0.0
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return max((now - published).total_seconds() / 86400, 0.0)
+
+# Shared HTTP client so upstream connections are pooled across requests
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared async HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            transport=httpx.AsyncHTTPTransport(
+                retries=1,
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        )
+    return _http_client
+
+async def close_client() -> None:
+    """Close the shared async HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
  
 class SearchService:
     """Multi-source search aggregator for OmniMind"""
     
     @staticmethod
     async def search_news(query: str, limit: int = 5) -> List[SearchResult]:
-        """Search news using NewsAPI"""
+        """Search news using NewsAPI, served from L1/Redis when cached"""
+        results = await SearchService._search_news(query, limit)
+        return results if results is not None else []
+    
+    @staticmethod
+    async def _search_news(query: str, limit: int) -> Optional[List[SearchResult]]:
+        """Cached, coalesced news search; returns None when NewsAPI failed"""
         if not settings.NEWSAPI_KEY:
             return []
         
+        key = f"v1:news:{hashlib.sha1(query.encode()).hexdigest()}:{limit}"
+        cached = await _get_cached_results(key, NEWS_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
+        # Piggyback on an identical upstream call already in flight
+        inflight = _inflight.get(key)
+        if inflight is not None:
+            results = await asyncio.shield(inflight)
+            return list(results) if results is not None else None
+        
+        fut = asyncio.get_running_loop().create_future()
+        _inflight[key] = fut
+        try:
+            results = await SearchService._fetch_news(query, limit)
+            fut.set_result(results)
+            if results is None:
+                return None
+            
+            await _set_cached_results(key, results, NEWS_CACHE_TTL)
+            return list(results)
+        finally:
+            # Release waiters even if this call was cancelled
+            if not fut.done():
+                fut.set_result(None)
+            _inflight.pop(key, None)
+    
+    @staticmethod
+    async def _fetch_news(query: str, limit: int) -> Optional[List[SearchResult]]:
+        """Query NewsAPI directly; returns None on failure"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://newsapi.org/v2/everything",
-                    params={
-                        "q": query,
-                        "sortBy": "relevancy",
-                        "language": "en",
-                        "pageSize": limit,
-                        "apiKey": settings.NEWSAPI_KEY
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    results = []
-                    for article in data.get("articles", []):
-                        results.append(SearchResult(
-                            title=article.get("title", ""),
-                            url=article.get("url", ""),
-                            source=article.get("source", {}).get("name", "News"),
-                            snippet=article.get("description", ""),
-                            relevance_score=0.8,
-                            published_date=article.get("publishedAt"),
-                            author=article.get("author"),
-                            citations=None
-                        ))
-                    return results
+            client = get_client()
+            response = await client.get(
+                "https://newsapi.org/v2/everything",
+                params={
+                    "q": query,
+                    "sortBy": "relevancy",
+                    "language": "en",
+                    "pageSize": limit,
+                    "apiKey": settings.NEWSAPI_KEY
+                }
+            )
+            
+            if response.status_code == 200:
+                data = _news_decoder.decode(response.content)
+                # Fields are already type-checked by msgspec, skip pydantic validation
+                return [
+                    SearchResult.model_construct(
+                        title=article.title or "",
+                        url=article.url or "",
+                        source=(article.source and article.source.name) or "News",
+                        snippet=article.description or "",
+                        relevance_score=0.8,
+                        published_date=article.publishedAt,
+                        author=article.author,
+                        citations=None
+                    )
+                    for article in data.articles
+                ]
         except Exception as e:
             print(f"News search error: {e}")
         
-        return []
+        return None
     
     @staticmethod
     async def search_web(query: str, limit: int = 5) -> List[SearchResult]:
@@ -54,6 +199,20 @@ class SearchService:
     
     @staticmethod
     async def search_academic(query: str, limit: int = 5) -> List[SearchResult]:
+        """Search academic sources, served from L1/Redis when cached"""
+        key = f"v1:academic:{hashlib.sha1(query.encode()).hexdigest()}:{limit}"
+        cached = await _get_cached_results(key, SEARCH_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
+        results = await SearchService._fetch_academic(query, limit)
+        # Don't cache empty results from a failed call
+        if results:
+            await _set_cached_results(key, results, SEARCH_CACHE_TTL)
+        return results
+    
+    @staticmethod
+    async def _fetch_academic(query: str, limit: int) -> List[SearchResult]:
         """Placeholder for academic search - integrate with Google Scholar API"""
         # This would integrate with academic paper databases
         return []
@@ -64,20 +223,60 @@ class SearchService:
         if sources is None:
             sources = ["news", "web", "academic"]
         
-        all_results = []
+        key = (
+            f"v1:unified:{hashlib.sha1(query.encode()).hexdigest()}:"
+            f"{','.join(sorted(sources))}:{limit}"
+        )
+        cached = await _get_cached_results(key, SEARCH_CACHE_TTL)
+        if cached is not None:
+            return cached
         
+        tasks = []
         if "news" in sources:
-            news_results = await SearchService.search_news(query, limit=limit)
-            all_results.extend(news_results)
-        
+            tasks.append(SearchService._search_news(query, limit))
         if "web" in sources:
-            web_results = await SearchService.search_web(query, limit=limit)
-            all_results.extend(web_results)
-        
+            tasks.append(SearchService.search_web(query, limit=limit))
         if "academic" in sources:
-            academic_results = await SearchService.search_academic(query, limit=limit)
-            all_results.extend(academic_results)
+            tasks.append(SearchService.search_academic(query, limit=limit))
+        
+        # Query all selected sources concurrently
+        results_lists = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Failed sources come back as an exception or None
+        ok_lists = []
+        for result in results_lists:
+            if isinstance(result, BaseException):
+                print(f"Unified search error: {result}")
+                continue
+            if result is None:
+                continue
+            ok_lists.append(result)
+        
+        # Keep the top results by relevance score without a full sort;
+        # a None limit (allowed by SearchQuery) returns everything
+        all_results = itertools.chain.from_iterable(ok_lists)
+        if limit is None:
+            top_results = sorted(all_results, key=lambda x: x.relevance_score, reverse=True)
+        else:
+            top_results = heapq.nlargest(limit, all_results, key=lambda x: x.relevance_score)
+        
+        # Don't cache empty or partial results from a failed source
+        if top_results and len(ok_lists) == len(results_lists):
+            await _set_cached_results(key, top_results, SEARCH_CACHE_TTL)
+        return top_results
+    
+    @staticmethod
+    def rerank(results: List[SearchResult]) -> List[SearchResult]:
+        """Reorder results by relevance, citations and recency"""
+        if not results:
+            return []
+        
+        import numpy as np
+        
+        now = datetime.now(timezone.utc)
+        rel = np.asarray([r.relevance_score for r in results], dtype=np.float64)
+        cites = np.asarray([r.citations or 0 for r in results], dtype=np.float64)
+        age = np.asarray([_age_days(r.published_date, now) for r in results], dtype=np.float64)
         
-        # Sort by relevance score
-        all_results.sort(key=lambda x: x.relevance_score, reverse=True)
-        return all_results[:limit]
+        order = np.argsort(-_rerank_kernel()(rel, cites, age), kind="stable")
+        return [results[i] for i in order]